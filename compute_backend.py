@@ -0,0 +1,280 @@
+# compute_backend.py
+# Pluggable Compute Backend Module
+# Inventory Rewired Project
+#
+# The heavy groupby/merge stages of the pipeline can run on pandas (default),
+# DuckDB (embedded SQL) or Polars lazy queries. DuckDB and Polars are optional
+# and are only imported when selected. Every backend accepts either a pandas
+# DataFrame or a path to a Parquet file for the sales table and returns a pandas
+# DataFrame with exactly the same column layout as the pandas path.
+
+import pandas as pd
+import numpy as np
+
+SUPPORTED_BACKENDS = ('pandas', 'duckdb', 'polars')
+
+DEMAND_STATS_COLUMNS = ['store_id', 'sku_id', 'avg_daily_demand', 'demand_std', 'total_demand',
+                        'days_sold', 'min_demand', 'max_demand']
+SKU_REVENUE_COLUMNS = ['sku_id', 'quantity_sold', 'revenue']
+KPI_DATA_COLUMNS = ['store_id', 'sku_id', 'total_sold', 'avg_daily_sales',
+                    'total_revenue', 'current_stock', 'unit_cost']
+
+def _check_backend(backend):
+    """Validate the requested backend name"""
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unknown compute backend '{backend}'. "
+                         f"Choose one of: {', '.join(SUPPORTED_BACKENDS)}")
+
+def _is_path(data):
+    """True when a table is given as a Parquet file path instead of a DataFrame"""
+    return isinstance(data, str)
+
+def _read_pandas(data, columns=None):
+    """Materialise a table for the pandas backend"""
+    if _is_path(data):
+        return pd.read_parquet(data, columns=columns)
+    return data
+
+def _restore_integer_columns(df, columns):
+    """Cast integral float columns back to int64 (SQL sums widen integer types)"""
+    for col in columns:
+        values = df[col]
+        if values.notna().all() and np.allclose(values, np.round(values)):
+            df[col] = values.astype('int64')
+    return df
+
+# ---------------------------------------------------------------------------
+# DuckDB helpers
+# ---------------------------------------------------------------------------
+
+def _duckdb_connect(**tables):
+    """Open an in-memory DuckDB connection with the given tables available as views"""
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("The 'duckdb' backend requires the duckdb package (pip install duckdb)")
+
+    con = duckdb.connect()
+    for name, data in tables.items():
+        if _is_path(data):
+            con.read_parquet(data).create_view(name)
+        else:
+            con.register(name, data)
+    return con
+
+# ---------------------------------------------------------------------------
+# Polars helpers
+# ---------------------------------------------------------------------------
+
+def _polars_scan(data, columns):
+    """Return a Polars LazyFrame over a DataFrame or Parquet file"""
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("The 'polars' backend requires the polars package (pip install polars)")
+
+    if _is_path(data):
+        return pl.scan_parquet(data).select(columns)
+    return pl.from_pandas(data[columns]).lazy()
+
+# ---------------------------------------------------------------------------
+# Demand statistics (analyze_demand_patterns)
+# ---------------------------------------------------------------------------
+
+def aggregate_demand_stats(sales_data, backend='pandas'):
+    """Daily demand statistics by store and SKU"""
+    _check_backend(backend)
+
+    if backend == 'pandas':
+        sales_data = _read_pandas(sales_data, columns=['store_id', 'sku_id', 'quantity_sold'])
+        demand_stats = sales_data.groupby(['store_id', 'sku_id']).agg({
+            'quantity_sold': ['mean', 'std', 'sum', 'count', 'min', 'max']
+        })
+        demand_stats.columns = DEMAND_STATS_COLUMNS[2:]
+        return demand_stats.reset_index()
+
+    if backend == 'duckdb':
+        con = _duckdb_connect(sales=sales_data)
+        demand_stats = con.execute("""
+            SELECT store_id, sku_id,
+                   AVG(quantity_sold) AS avg_daily_demand,
+                   STDDEV_SAMP(quantity_sold) AS demand_std,
+                   SUM(quantity_sold) AS total_demand,
+                   COUNT(quantity_sold) AS days_sold,
+                   MIN(quantity_sold) AS min_demand,
+                   MAX(quantity_sold) AS max_demand
+            FROM sales
+            GROUP BY store_id, sku_id
+            ORDER BY store_id, sku_id
+        """).df()
+        con.close()
+    else:
+        import polars as pl
+        q = pl.col('quantity_sold')
+        demand_stats = (
+            _polars_scan(sales_data, ['store_id', 'sku_id', 'quantity_sold'])
+            .group_by(['store_id', 'sku_id'])
+            .agg([q.mean().alias('avg_daily_demand'), q.std().alias('demand_std'),
+                  q.sum().alias('total_demand'), q.count().alias('days_sold'),
+                  q.min().alias('min_demand'), q.max().alias('max_demand')])
+            .sort(['store_id', 'sku_id'])
+            .collect()
+            .to_pandas()
+        )
+
+    demand_stats = demand_stats[DEMAND_STATS_COLUMNS]
+    demand_stats['days_sold'] = demand_stats['days_sold'].astype('int64')
+    return _restore_integer_columns(demand_stats, ['total_demand', 'min_demand', 'max_demand'])
+
+# ---------------------------------------------------------------------------
+# SKU revenue (abc_classification)
+# ---------------------------------------------------------------------------
+
+def aggregate_sku_revenue(sales_data, sku_master, backend='pandas'):
+    """Total quantity and revenue by SKU across all stores"""
+    _check_backend(backend)
+
+    if backend == 'pandas':
+        sales_data = _read_pandas(sales_data)
+        sku_revenue = sales_data.merge(sku_master, on='sku_id')
+        sku_revenue['revenue'] = sku_revenue['quantity_sold'] * sku_revenue['unit_cost']
+        return sku_revenue.groupby('sku_id').agg({
+            'quantity_sold': 'sum',
+            'revenue': 'sum'
+        }).reset_index()
+
+    if backend == 'duckdb':
+        con = _duckdb_connect(sales=sales_data, sku_master=sku_master[['sku_id', 'unit_cost']])
+        sku_revenue = con.execute("""
+            SELECT s.sku_id,
+                   SUM(s.quantity_sold) AS quantity_sold,
+                   SUM(s.quantity_sold * m.unit_cost) AS revenue
+            FROM sales s
+            JOIN sku_master m ON s.sku_id = m.sku_id
+            GROUP BY s.sku_id
+            ORDER BY s.sku_id
+        """).df()
+        con.close()
+    else:
+        import polars as pl
+        sku_revenue = (
+            _polars_scan(sales_data, ['sku_id', 'quantity_sold'])
+            .join(_polars_scan(sku_master, ['sku_id', 'unit_cost']), on='sku_id')
+            .group_by('sku_id')
+            .agg([pl.col('quantity_sold').sum(),
+                  (pl.col('quantity_sold') * pl.col('unit_cost')).sum().alias('revenue')])
+            .sort('sku_id')
+            .collect()
+            .to_pandas()
+        )
+
+    sku_revenue = sku_revenue[SKU_REVENUE_COLUMNS]
+    return _restore_integer_columns(sku_revenue, ['quantity_sold'])
+
+# ---------------------------------------------------------------------------
+# Store-SKU KPI table (calculate_current_performance_kpis)
+# ---------------------------------------------------------------------------
+
+def aggregate_kpi_data(sales_data, inventory_data, sku_master, backend='pandas'):
+    """Per store-SKU sales, revenue and stock table plus zero-sale row counts
+
+    Returns (kpi_data, zero_sale_rows, total_rows).
+    """
+    _check_backend(backend)
+
+    if backend == 'pandas':
+        sales_data = _read_pandas(sales_data)
+        current_performance = sales_data.merge(sku_master, on='sku_id')
+        current_performance = current_performance.merge(inventory_data, on=['store_id', 'sku_id'])
+        current_performance['revenue'] = current_performance['quantity_sold'] * current_performance['unit_cost']
+
+        kpi_data = current_performance.groupby(['store_id', 'sku_id']).agg({
+            'quantity_sold': ['sum', 'mean'],
+            'revenue': 'sum',
+            'current_stock': 'first',
+            'unit_cost': 'first'
+        }).reset_index()
+        kpi_data.columns = KPI_DATA_COLUMNS
+
+        zero_sale_rows = int((sales_data['quantity_sold'] == 0).sum())
+        return kpi_data, zero_sale_rows, len(sales_data)
+
+    if backend == 'duckdb':
+        con = _duckdb_connect(sales=sales_data,
+                              sku_master=sku_master[['sku_id', 'unit_cost']],
+                              inventory=inventory_data[['store_id', 'sku_id', 'current_stock']])
+        kpi_data = con.execute("""
+            SELECT s.store_id, s.sku_id,
+                   SUM(s.quantity_sold) AS total_sold,
+                   AVG(s.quantity_sold) AS avg_daily_sales,
+                   SUM(s.quantity_sold * m.unit_cost) AS total_revenue,
+                   FIRST(i.current_stock) AS current_stock,
+                   FIRST(m.unit_cost) AS unit_cost
+            FROM sales s
+            JOIN sku_master m ON s.sku_id = m.sku_id
+            JOIN inventory i ON s.store_id = i.store_id AND s.sku_id = i.sku_id
+            GROUP BY s.store_id, s.sku_id
+            ORDER BY s.store_id, s.sku_id
+        """).df()
+        zero_sale_rows, total_rows = con.execute("""
+            SELECT COUNT(*) FILTER (WHERE quantity_sold = 0), COUNT(*) FROM sales
+        """).fetchone()
+        con.close()
+    else:
+        import polars as pl
+        q = pl.col('quantity_sold')
+        sales = _polars_scan(sales_data, ['store_id', 'sku_id', 'quantity_sold'])
+        kpi_data = (
+            sales
+            .join(_polars_scan(sku_master, ['sku_id', 'unit_cost']), on='sku_id')
+            .join(_polars_scan(inventory_data, ['store_id', 'sku_id', 'current_stock']),
+                  on=['store_id', 'sku_id'])
+            .group_by(['store_id', 'sku_id'])
+            .agg([q.sum().alias('total_sold'), q.mean().alias('avg_daily_sales'),
+                  (q * pl.col('unit_cost')).sum().alias('total_revenue'),
+                  pl.col('current_stock').first(), pl.col('unit_cost').first()])
+            .sort(['store_id', 'sku_id'])
+            .collect()
+            .to_pandas()
+        )
+        counts = sales.select([(q == 0).sum().alias('zero'), pl.len().alias('total')]).collect()
+        zero_sale_rows, total_rows = counts['zero'][0], counts['total'][0]
+
+    kpi_data = kpi_data[KPI_DATA_COLUMNS]
+    kpi_data = _restore_integer_columns(kpi_data, ['total_sold', 'current_stock'])
+    return kpi_data, int(zero_sale_rows), int(total_rows)
+
+# ---------------------------------------------------------------------------
+# Parity check
+# ---------------------------------------------------------------------------
+
+def compare_backends(sales_data, inventory_data, sku_master, backend, reference='pandas'):
+    """Run every aggregation stage on two backends and check the outputs match
+
+    Returns a dict of stage name -> True/False. Column names and order must be
+    identical; values are compared with a small floating point tolerance.
+    """
+    _check_backend(backend)
+    _check_backend(reference)
+
+    def _matches(left, right):
+        if list(left.columns) != list(right.columns) or len(left) != len(right):
+            return False
+        try:
+            pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True),
+                                          check_dtype=False, check_exact=False, rtol=1e-9)
+        except AssertionError:
+            return False
+        return True
+
+    results = {}
+    results['demand_stats'] = _matches(aggregate_demand_stats(sales_data, backend),
+                                       aggregate_demand_stats(sales_data, reference))
+    results['sku_revenue'] = _matches(aggregate_sku_revenue(sales_data, sku_master, backend),
+                                      aggregate_sku_revenue(sales_data, sku_master, reference))
+
+    kpi_a, zero_a, total_a = aggregate_kpi_data(sales_data, inventory_data, sku_master, backend)
+    kpi_b, zero_b, total_b = aggregate_kpi_data(sales_data, inventory_data, sku_master, reference)
+    results['kpi_data'] = _matches(kpi_a, kpi_b) and (zero_a, total_a) == (zero_b, total_b)
+
+    return results
@@ -5,6 +5,15 @@
 import pandas as pd
 import numpy as np
 import random
+import hashlib
+from collections import OrderedDict
+from demand_distributions import sample_fitted_demand
+
+# Cost-benefit assumptions shared by the single-plan functions and PlanEvaluator
+HOLDING_COST_RATE = 0.25  # 25% annual holding cost
+COST_OF_CAPITAL = 0.12  # 12% cost of capital
+TARGET_FILL_RATE = 0.98  # 98% target
+IMPLEMENTATION_COST = 100000  # ₹1 lakh for system setup and training
 
 def calculate_cost_benefit_analysis(inventory_model, current_kpis):
     """Calculate cost-benefit analysis of proposed inventory model"""
@@ -28,11 +37,11 @@ def calculate_cost_benefit_analysis(inventory_model, current_kpis):
     
     # Cost comparison
     inventory_reduction = current_total_inventory_value - proposed_total_inventory_value
-    holding_cost_savings = inventory_reduction * 0.25  # 25% holding cost
+    holding_cost_savings = inventory_reduction * HOLDING_COST_RATE
     
     # Revenue impact from improved fill rate
-    target_fill_rate = 0.98  # 98% target
-    fill_rate_improvement = target_fill_rate - current_fill_rate
+    target_fill_rate = TARGET_FILL_RATE
+    fill_rate_improvement = max(target_fill_rate - current_fill_rate, 0)
     
     # Estimate current annual revenue
     avg_daily_revenue = inventory_model['annual_revenue'].sum() / 365
@@ -45,7 +54,7 @@ def calculate_cost_benefit_analysis(inventory_model, current_kpis):
     total_annual_savings = holding_cost_savings + revenue_from_improved_service
     
     # Implementation costs (one-time)
-    implementation_cost = 100000  # ₹1 lakh for system setup and training
+    implementation_cost = IMPLEMENTATION_COST
     
     # ROI calculations
     roi_percentage = (total_annual_savings / implementation_cost) * 100
@@ -71,8 +80,28 @@ def calculate_cost_benefit_analysis(inventory_model, current_kpis):
     
     return cost_benefit
 
-def simulate_inventory_performance(inventory_model, sales_data, simulation_days=21):
-    """Simulate inventory performance over 3 weeks"""
+def _draw_simulation_demand(inventory_model, demand_distributions, simulation_days):
+    """Daily demand (pairs x days) from fitted distributions, Poisson where no fit exists"""
+    fitted = inventory_model[['store_id', 'sku_id']].merge(
+        demand_distributions, on=['store_id', 'sku_id'], how='left'
+    )
+    has_fit = fitted['dist_family'].notna().to_numpy()
+    
+    demand = np.random.poisson(
+        inventory_model['avg_daily_demand'].to_numpy(dtype=float)[:, None],
+        (len(inventory_model), simulation_days)
+    ).astype(float)
+    if has_fit.any():
+        demand[has_fit] = sample_fitted_demand(fitted[has_fit], simulation_days)
+    return demand
+
+def simulate_inventory_performance(inventory_model, sales_data, simulation_days=21,
+                                   demand_distributions=None):
+    """Simulate inventory performance over 3 weeks
+
+    Daily demand is Poisson around the average, or drawn from the fitted
+    `demand_distributions` when given.
+    """
     print(f"Running {simulation_days}-day simulation...")
     
     # Initialize simulation data
@@ -82,7 +111,11 @@ def simulate_inventory_performance(inventory_model, sales_data, simulation_days=
     store_sku_combinations = inventory_model[['store_id', 'sku_id', 'reorder_point', 
                                            'eoq', 'safety_stock', 'avg_daily_demand']].copy()
     
-    for idx, row in store_sku_combinations.iterrows():
+    # Pre-draw demand for all pairs in one batch
+    if demand_distributions is not None:
+        simulated_demand = _draw_simulation_demand(inventory_model, demand_distributions, simulation_days)
+    
+    for i, (idx, row) in enumerate(store_sku_combinations.iterrows()):
         store_id = row['store_id']
         sku_id = row['sku_id']
         rop = row['reorder_point']
@@ -101,7 +134,10 @@ def simulate_inventory_performance(inventory_model, sales_data, simulation_days=
         
         for day in range(simulation_days):
             # Generate daily demand (with variability)
-            daily_demand = max(0, np.random.poisson(avg_demand))
+            if demand_distributions is not None:
+                daily_demand = simulated_demand[i, day]
+            else:
+                daily_demand = max(0, np.random.poisson(avg_demand))
             total_demand += daily_demand
             
             # Check if we can fulfill demand
@@ -150,6 +186,120 @@ def simulate_inventory_performance(inventory_model, sales_data, simulation_days=
     
     return simulation_df, simulation_summary
 
+def simulate_perishable_inventory(inventory_model, simulation_days=21, initial_life_fraction=0.5,
+                                  demand_distributions=None):
+    """Simulate inventory performance with shelf-life expiry, vectorized across pairs
+
+    Stock is held as FIFO batches in fixed-size (pairs x batches) arrays of
+    quantity and remaining shelf life. Demand is served from the oldest batch
+    first and batches reaching the end of their shelf life are written off as
+    waste. Starting stock is assumed to have `initial_life_fraction` of its
+    shelf life remaining. Demand is Poisson around the average, or drawn from
+    the fitted `demand_distributions` when given.
+    """
+    print(f"Running {simulation_days}-day perishable simulation...")
+    
+    pairs = inventory_model[['store_id', 'sku_id', 'reorder_point', 'eoq', 'safety_stock',
+                             'avg_daily_demand', 'shelf_life_days', 'unit_cost']].reset_index(drop=True)
+    n_pairs = len(pairs)
+    
+    rop = pairs['reorder_point'].to_numpy(dtype=float)
+    eoq = pairs['eoq'].to_numpy(dtype=float)
+    avg_demand = pairs['avg_daily_demand'].to_numpy(dtype=float)
+    shelf_life = pairs['shelf_life_days'].to_numpy(dtype=float)
+    
+    # At most one order arrives per day and none outlives its shelf life,
+    # so this many slots never overflow
+    n_batches = int(min(simulation_days, shelf_life.max(initial=0))) + 2
+    batch_qty = np.zeros((n_pairs, n_batches))
+    batch_life = np.zeros((n_pairs, n_batches))
+    
+    # Starting inventory as a single batch (start at mid-cycle)
+    batch_qty[:, 0] = rop + (eoq * 0.5)
+    batch_life[:, 0] = np.ceil(shelf_life * initial_life_fraction)
+    
+    total_demand = np.zeros(n_pairs)
+    total_sales = np.zeros(n_pairs)
+    stockouts = np.zeros(n_pairs, dtype=int)
+    orders_placed = np.zeros(n_pairs, dtype=int)
+    waste_units = np.zeros(n_pairs)
+    
+    rows = np.arange(n_pairs)
+    
+    if demand_distributions is not None:
+        simulated_demand = _draw_simulation_demand(pairs, demand_distributions, simulation_days)
+    
+    for day in range(simulation_days):
+        # Generate daily demand (with variability)
+        if demand_distributions is not None:
+            daily_demand = simulated_demand[:, day]
+        else:
+            daily_demand = np.random.poisson(avg_demand).astype(float)
+        total_demand += daily_demand
+        
+        # Fulfil demand FIFO: each batch gives what the older batches could not
+        on_hand = batch_qty.sum(axis=1)
+        stockouts += (daily_demand > on_hand)
+        demand_before = daily_demand[:, None] - (np.cumsum(batch_qty, axis=1) - batch_qty)
+        taken = np.clip(demand_before, 0, batch_qty)
+        batch_qty -= taken
+        total_sales += taken.sum(axis=1)
+        
+        # Age stock by one day and write off expired batches
+        batch_life -= 1
+        expired = (batch_life <= 0) & (batch_qty > 0)
+        waste_units += np.where(expired, batch_qty, 0).sum(axis=1)
+        batch_qty[expired] = 0
+        
+        # Compact live batches to the front, oldest first
+        order = np.argsort(np.where(batch_qty > 0, batch_life, np.inf), axis=1, kind='stable')
+        batch_qty = np.take_along_axis(batch_qty, order, axis=1)
+        batch_life = np.take_along_axis(batch_life, order, axis=1)
+        
+        # Check if reorder is needed; immediate delivery goes after the live batches
+        reorder = (batch_qty.sum(axis=1) <= rop) & (eoq > 0)
+        slot = (batch_qty > 0).sum(axis=1)
+        batch_qty[rows[reorder], slot[reorder]] = eoq[reorder]
+        batch_life[rows[reorder], slot[reorder]] = shelf_life[reorder]
+        orders_placed += reorder
+    
+    # Calculate performance metrics
+    fill_rate = np.divide(total_sales * 100, total_demand,
+                          out=np.full(n_pairs, 100.0), where=total_demand > 0)
+    
+    simulation_df = pd.DataFrame({
+        'store_id': pairs['store_id'],
+        'sku_id': pairs['sku_id'],
+        'total_demand': total_demand,
+        'total_sales': total_sales,
+        'stockout_days': stockouts,
+        'fill_rate': fill_rate,
+        'orders_placed': orders_placed,
+        'final_stock': batch_qty.sum(axis=1),
+        'waste_units': waste_units,
+        'waste_value': waste_units * pairs['unit_cost'].to_numpy(dtype=float)
+    })
+    
+    # Summary statistics
+    simulation_summary = {
+        'avg_fill_rate': simulation_df['fill_rate'].mean(),
+        'total_stockout_days': simulation_df['stockout_days'].sum(),
+        'total_orders_placed': simulation_df['orders_placed'].sum(),
+        'skus_with_stockouts': len(simulation_df[simulation_df['stockout_days'] > 0]),
+        'perfect_fill_rate_skus': len(simulation_df[simulation_df['fill_rate'] == 100]),
+        'total_waste_units': simulation_df['waste_units'].sum(),
+        'total_waste_value': simulation_df['waste_value'].sum()
+    }
+    
+    print(f"✓ Simulation completed:")
+    print(f"  - Average fill rate: {simulation_summary['avg_fill_rate']:.1f}%")
+    print(f"  - Total stockout days: {simulation_summary['total_stockout_days']}")
+    print(f"  - SKUs achieving 100% fill rate: {simulation_summary['perfect_fill_rate_skus']}")
+    print(f"  - Expired stock: {simulation_summary['total_waste_units']:,.0f} units "
+          f"(₹{simulation_summary['total_waste_value']:,.0f})")
+    
+    return simulation_df, simulation_summary
+
 def calculate_working_capital_impact(inventory_model, current_kpis):
     """Calculate working capital impact"""
     
@@ -157,16 +307,18 @@ def calculate_working_capital_impact(inventory_model, current_kpis):
     current_wc = current_kpis['total_inventory_value']
     
     # Proposed working capital
-    proposed_wc = inventory_model.groupby('sku_id').apply(
-        lambda x: (x['max_inventory'].mean() * x['unit_cost'].iloc[0])
-    ).sum()
+    proposed_levels = inventory_model.groupby('sku_id').agg({
+        'max_inventory': 'mean',
+        'unit_cost': 'first'
+    })
+    proposed_wc = (proposed_levels['max_inventory'] * proposed_levels['unit_cost']).sum()
     
     # Working capital reduction
     wc_reduction = current_wc - proposed_wc
     wc_reduction_percentage = (wc_reduction / current_wc) * 100
     
     # Free up cash for other investments
-    opportunity_cost_savings = wc_reduction * 0.12  # 12% cost of capital
+    opportunity_cost_savings = wc_reduction * COST_OF_CAPITAL
     
     return {
         'current_working_capital': current_wc,
@@ -174,4 +326,102 @@ def calculate_working_capital_impact(inventory_model, current_kpis):
         'working_capital_reduction': wc_reduction,
         'wc_reduction_percentage': wc_reduction_percentage,
         'opportunity_cost_savings': opportunity_cost_savings
-    }
\ No newline at end of file
+    }
+
+class PlanEvaluator:
+    """Evaluate cost-benefit and working capital for many candidate plans
+
+    A plan is a `max_inventory` vector aligned with the rows of
+    `inventory_model`. The SKU grouping and unit costs are precomputed once:
+    proposed inventory value (SKU mean of max_inventory x unit cost, as in
+    calculate_cost_benefit_analysis) becomes a dot product with per-row
+    weights, so a whole matrix of plans is evaluated in one call. Results for
+    recently seen plans are kept in a small LRU cache keyed on the plan hash.
+    """
+
+    def __init__(self, inventory_model, current_kpis, holding_cost_rate=HOLDING_COST_RATE,
+                 cost_of_capital=COST_OF_CAPITAL, target_fill_rate=TARGET_FILL_RATE,
+                 implementation_cost=IMPLEMENTATION_COST, cache_size=128):
+        codes, skus = pd.factorize(inventory_model['sku_id'], sort=True)
+        unit_cost = inventory_model.groupby('sku_id')['unit_cost'].first().reindex(skus).to_numpy()
+        pairs_per_sku = np.bincount(codes, minlength=len(skus))
+
+        self.skus = skus
+        self.n_rows = len(inventory_model)
+        self.value_weights = unit_cost[codes] / pairs_per_sku[codes]
+        self.baseline_plan = inventory_model['max_inventory'].to_numpy(dtype=float)
+
+        self.current_inventory_value = current_kpis['total_inventory_value']
+        self.holding_cost_rate = holding_cost_rate
+        self.cost_of_capital = cost_of_capital
+        self.implementation_cost = implementation_cost
+
+        # Revenue from improved service does not depend on the plan
+        current_fill_rate = current_kpis['fill_rate'] / 100
+        self.revenue_from_improved_service = (
+            inventory_model['annual_revenue'].sum() * max(target_fill_rate - current_fill_rate, 0)
+        )
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _plan_key(plan):
+        return hashlib.sha1(np.ascontiguousarray(plan, dtype=float).tobytes()).hexdigest()
+
+    def _evaluate_uncached(self, plans):
+        """Metrics matrix (plans x metrics) for a matrix of plans"""
+        proposed_value = plans @ self.value_weights
+        inventory_reduction = self.current_inventory_value - proposed_value
+        holding_cost_savings = inventory_reduction * self.holding_cost_rate
+        total_annual_savings = holding_cost_savings + self.revenue_from_improved_service
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_percentage = total_annual_savings / self.implementation_cost * 100
+            payback_months = self.implementation_cost / total_annual_savings * 12
+            wc_reduction_percentage = inventory_reduction / self.current_inventory_value * 100
+
+        return np.column_stack([
+            proposed_value, inventory_reduction, holding_cost_savings, total_annual_savings,
+            roi_percentage, payback_months, wc_reduction_percentage,
+            inventory_reduction * self.cost_of_capital
+        ])
+
+    def evaluate(self, plans=None):
+        """Evaluate one plan or a (plans x rows) matrix of plans
+
+        Returns a DataFrame with one row per plan.
+        """
+        if plans is None:
+            plans = self.baseline_plan
+        plans = np.atleast_2d(np.asarray(plans, dtype=float))
+        if plans.shape[1] != self.n_rows:
+            raise ValueError(f"Each plan needs {self.n_rows} max_inventory values, got {plans.shape[1]}")
+
+        keys = [self._plan_key(plan) for plan in plans]
+        metrics = np.full((len(plans), 8), np.nan)
+
+        # Read every cache hit before inserting anything, so evictions made
+        # while storing this batch's new results cannot hide a hit
+        missing = []
+        for i, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                metrics[i] = self._cache[key]
+            else:
+                missing.append(i)
+
+        if missing:
+            metrics[missing] = self._evaluate_uncached(plans[missing])
+            for i in missing:
+                self._cache[keys[i]] = metrics[i].copy()
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        results = pd.DataFrame(metrics, columns=[
+            'proposed_inventory_value', 'inventory_reduction', 'holding_cost_savings',
+            'total_annual_savings', 'roi_percentage', 'payback_months',
+            'wc_reduction_percentage', 'opportunity_cost_savings'
+        ])
+        results.insert(0, 'plan_hash', keys)
+        return results
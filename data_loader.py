@@ -5,49 +5,53 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from data_validation import VALIDATION_RULES, validate_datasets
 
-def load_and_prepare_data():
-    """Load and prepare all data from Excel file"""
+def load_and_prepare_data(return_quarantine=False):
+    """Load, validate and prepare all data from Excel file
+
+    Rows failing validation are removed and listed in a quarantine table,
+    returned as a sixth value when `return_quarantine` is True.
+    """
+    # Load Excel file with all sheets
+    excel_file = 'InventoryRewired_Dataset.xlsx'
+    
+    print("Loading data from Excel file...")
+    
     try:
-        # Load Excel file with all sheets
-        excel_file = 'InventoryRewired_Dataset.xlsx'
-        
-        print("Loading data from Excel file...")
-        
-        # Load all sheets
-        sales_data = pd.read_excel(excel_file, sheet_name='Sales_data')
-        inventory_data = pd.read_excel(excel_file, sheet_name='Inventory_data')
-        sku_master = pd.read_excel(excel_file, sheet_name='SKU_master')
-        purchase_orders = pd.read_excel(excel_file, sheet_name='Purchase_orders')
-        supplier_data = pd.read_excel(excel_file, sheet_name='Supplier_data')
-        
-        # Data preparation and cleaning
-        sales_data = prepare_sales_data(sales_data)
-        inventory_data = prepare_inventory_data(inventory_data)
-        sku_master = prepare_sku_master(sku_master)
-        purchase_orders = prepare_purchase_orders(purchase_orders)
-        supplier_data = prepare_supplier_data(supplier_data)
-        
-        print(f"✓ Sales data: {len(sales_data)} records")
-        print(f"✓ Inventory data: {len(inventory_data)} records")
-        print(f"✓ SKU master: {len(sku_master)} SKUs")
-        print(f"✓ Purchase orders: {len(purchase_orders)} orders")
-        print(f"✓ Supplier data: {len(supplier_data)} suppliers")
-        
-        return sales_data, inventory_data, sku_master, purchase_orders, supplier_data
-        
-    except Exception as e:
-        print(f"Error loading data: {e}")
+        sheets = pd.read_excel(excel_file, sheet_name=list(VALIDATION_RULES))
+    except FileNotFoundError:
+        print(f"Error loading data: '{excel_file}' not found")
         print("Please ensure 'InventoryRewired_Dataset.xlsx' is in the same directory")
-        return None, None, None, None, None
+        raise
+    
+    # Validate and quarantine bad rows
+    sheets, quarantine = validate_datasets(sheets)
+    
+    # Data preparation and cleaning
+    sales_data = prepare_sales_data(sheets['Sales_data'])
+    inventory_data = prepare_inventory_data(sheets['Inventory_data'])
+    sku_master = prepare_sku_master(sheets['SKU_master'])
+    purchase_orders = prepare_purchase_orders(sheets['Purchase_orders'])
+    supplier_data = prepare_supplier_data(sheets['Supplier_data'])
+    
+    print(f"✓ Sales data: {len(sales_data)} records")
+    print(f"✓ Inventory data: {len(inventory_data)} records")
+    print(f"✓ SKU master: {len(sku_master)} SKUs")
+    print(f"✓ Purchase orders: {len(purchase_orders)} orders")
+    print(f"✓ Supplier data: {len(supplier_data)} suppliers")
+    
+    if return_quarantine:
+        return sales_data, inventory_data, sku_master, purchase_orders, supplier_data, quarantine
+    return sales_data, inventory_data, sku_master, purchase_orders, supplier_data
 
 def prepare_sales_data(df):
     """Clean and prepare sales data"""
     # Convert date column
     df['date'] = pd.to_datetime(df['date'])
     
-    # Remove any negative quantities (data quality check)
-    df = df[df['quantity_sold'] >= 0]
+    # Remove any negative quantities (quarantined during validation)
+    df = df[df['quantity_sold'] >= 0].copy()
     
     # Add derived columns
     df['year'] = df['date'].dt.year
@@ -0,0 +1,205 @@
+# data_validation.py
+# Data Validation and Quarantine Module
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+
+# Declarative rule sets per sheet. Sheets are validated in this order so that
+# SKU_master and Inventory_data can serve as reference lists for the others.
+# Column kinds: 'string' values must be text, 'numeric' and 'datetime' values
+# must convert.
+VALIDATION_RULES = {
+    'SKU_master': {
+        'columns': {'sku_id': 'string', 'category': 'string', 'unit_cost': 'numeric',
+                    'avg_lead_time': 'numeric', 'shelf_life_days': 'numeric'},
+        'ranges': {'unit_cost': (0, None), 'avg_lead_time': (0, None), 'shelf_life_days': (0, None)},
+        'unique_keys': ['sku_id']
+    },
+    'Inventory_data': {
+        'columns': {'store_id': 'string', 'sku_id': 'string', 'current_stock': 'numeric'},
+        'ranges': {'current_stock': (0, None)},
+        'known_skus': True,
+        'unique_keys': ['store_id', 'sku_id']
+    },
+    'Sales_data': {
+        'columns': {'date': 'datetime', 'store_id': 'string', 'sku_id': 'string',
+                    'quantity_sold': 'numeric'},
+        'ranges': {'quantity_sold': (0, None)},
+        'known_skus': True,
+        'known_stores': True,
+        'unique_keys': ['date', 'store_id', 'sku_id'],
+        'outliers': {'column': 'quantity_sold', 'by': ['store_id', 'sku_id'], 'threshold': 6.0}
+    },
+    'Purchase_orders': {
+        'columns': {'po_id': 'string', 'sku_id': 'string', 'order_date': 'datetime',
+                    'expected_delivery_date': 'datetime', 'quantity_ordered': 'numeric'},
+        'ranges': {'quantity_ordered': (0, None)},
+        'date_order': ('order_date', 'expected_delivery_date'),
+        'known_skus': True,
+        'unique_keys': ['po_id']
+    },
+    'Supplier_data': {
+        'columns': {'sku_id': 'string', 'supplier_id': 'string', 'service_level': 'numeric',
+                    'delay_rate': 'numeric'},
+        'ranges': {'service_level': (0, 1), 'delay_rate': (0, 1)},
+        'known_skus': True,
+        'unique_keys': ['sku_id']
+    }
+}
+
+QUARANTINE_COLUMNS = ['sheet', 'row', 'reason_code', 'column']
+
+class DataValidationError(Exception):
+    """Raised when a sheet cannot be validated at all (e.g. missing columns)"""
+
+def validate_sheet(df, sheet_name, rules, known_skus=None, known_stores=None,
+                   valid_skus=None, valid_stores=None):
+    """Apply a rule set to one sheet
+
+    `known_skus` / `known_stores` are the keys present in the raw reference
+    sheets (anything else is UNKNOWN_SKU / UNKNOWN_STORE); `valid_skus` /
+    `valid_stores` are the keys left after validating them, so rows whose
+    reference rows were all quarantined are flagged PARENT_QUARANTINED.
+    Returns (clean_df, quarantine) where quarantine lists one row per failed
+    (row, reason) with the sheet's original row position.
+    """
+    missing_columns = [col for col in rules['columns'] if col not in df.columns]
+    if missing_columns:
+        raise DataValidationError(f"{sheet_name} is missing required columns: {', '.join(missing_columns)}")
+
+    df = df.reset_index(drop=True)
+    failures = []
+
+    # Factorize each key column once; membership, duplicate and group checks reuse the codes
+    factorized = {}
+
+    def _factorize(col):
+        if col not in factorized:
+            factorized[col] = pd.factorize(df[col])
+        return factorized[col]
+
+    def _key_codes(cols):
+        key = np.zeros(len(df), dtype=np.int64)
+        for col in cols:
+            codes, uniques = _factorize(col)
+            key = key * (len(uniques) + 1) + codes + 1
+        return key
+
+    def _flag_values(col, flagged):
+        codes, uniques = _factorize(col)
+        flagged_values = np.asarray(flagged(pd.Index(uniques)), dtype=bool)
+        return pd.Series((codes >= 0) & flagged_values[np.maximum(codes, 0)], index=df.index)
+
+    def _unknown(col, known):
+        return _flag_values(col, lambda values: ~values.isin(known))
+
+    # Schema and dtype checks: coerce, flagging values that are missing or fail to convert
+    for col, kind in rules['columns'].items():
+        original = df[col]
+        if kind == 'numeric':
+            df[col] = pd.to_numeric(original, errors='coerce')
+        elif kind == 'datetime':
+            df[col] = pd.to_datetime(original, errors='coerce')
+        failures.append((original.isna(), 'MISSING_VALUE', col))
+        if kind == 'string':
+            not_text = _flag_values(col, lambda values: [not isinstance(value, str) for value in values])
+            failures.append((not_text, 'INVALID_TYPE', col))
+        else:
+            failures.append((df[col].isna() & original.notna(), 'INVALID_TYPE', col))
+
+    for col, (lower, upper) in rules.get('ranges', {}).items():
+        out_of_range = pd.Series(False, index=df.index)
+        if lower is not None:
+            out_of_range |= df[col] < lower
+        if upper is not None:
+            out_of_range |= df[col] > upper
+        failures.append((out_of_range, 'OUT_OF_RANGE', col))
+
+    if 'date_order' in rules:
+        start, end = rules['date_order']
+        failures.append((df[end] < df[start], 'INVALID_DATE_ORDER', end))
+
+    # Referential integrity: unknown keys, and known keys whose reference rows were quarantined
+    references = [('sku_id', 'known_skus', known_skus, valid_skus, 'UNKNOWN_SKU'),
+                  ('store_id', 'known_stores', known_stores, valid_stores, 'UNKNOWN_STORE')]
+    for col, rule, known, valid, reason in references:
+        if not rules.get(rule) or known is None:
+            continue
+        unknown = _unknown(col, known)
+        failures.append((unknown, reason, col))
+        if valid is not None:
+            failures.append((~unknown & _unknown(col, valid), 'PARENT_QUARANTINED', col))
+
+    # Duplicate keys: every occurrence after the first
+    keys = rules.get('unique_keys')
+    if keys:
+        duplicated = pd.Series(_key_codes(keys), index=df.index).duplicated(keep='first')
+        failures.append((duplicated, 'DUPLICATE_KEY', ', '.join(keys)))
+
+    # Spikes by robust z-score (median / MAD) within each group
+    if 'outliers' in rules:
+        outlier_rule = rules['outliers']
+        values = df[outlier_rule['column']]
+        groups = _key_codes(outlier_rule['by'])
+        median = values.groupby(groups).transform('median')
+        mad = (values - median).abs().groupby(groups).transform('median')
+        robust_z = 0.6745 * (values - median) / mad.where(mad > 0)
+        failures.append((robust_z.abs() > outlier_rule['threshold'], 'OUTLIER_SPIKE', outlier_rule['column']))
+
+    failed = np.zeros(len(df), dtype=bool)
+    quarantine = []
+    for mask, reason, col in failures:
+        mask = mask.fillna(False).to_numpy(dtype=bool)
+        if mask.any():
+            failed |= mask
+            quarantine.append(pd.DataFrame({'sheet': sheet_name, 'row': np.flatnonzero(mask),
+                                            'reason_code': reason, 'column': col}))
+
+    quarantine = (pd.concat(quarantine, ignore_index=True) if quarantine
+                  else pd.DataFrame(columns=QUARANTINE_COLUMNS))
+    if failed.any():
+        df = df[~failed]
+    return df, quarantine
+
+def validate_datasets(sheets, rules=VALIDATION_RULES):
+    """Validate every sheet, quarantining failed rows
+
+    `sheets` maps sheet name to raw DataFrame. Returns (clean_sheets, quarantine).
+    """
+    print("Validating data...")
+
+    clean = {}
+    quarantine = []
+    known_skus = valid_skus = None
+    known_stores = valid_stores = None
+
+    for sheet_name, sheet_rules in rules.items():
+        clean[sheet_name], sheet_quarantine = validate_sheet(
+            sheets[sheet_name], sheet_name, sheet_rules, known_skus, known_stores, valid_skus, valid_stores
+        )
+        quarantine.append(sheet_quarantine)
+
+        if sheet_name == 'SKU_master':
+            known_skus = sheets[sheet_name]['sku_id'].dropna().unique()
+            valid_skus = clean[sheet_name]['sku_id'].unique()
+        elif sheet_name == 'Inventory_data':
+            known_stores = sheets[sheet_name]['store_id'].dropna().unique()
+            valid_stores = clean[sheet_name]['store_id'].unique()
+
+    quarantine = pd.concat(quarantine, ignore_index=True)
+    print_validation_summary(sheets, clean, quarantine)
+
+    return clean, quarantine
+
+def print_validation_summary(sheets, clean, quarantine):
+    """Print quarantined row counts by sheet and reason"""
+    if quarantine.empty:
+        print("✓ All rows passed validation")
+        return
+
+    for sheet_name, sheet_quarantine in quarantine.groupby('sheet', sort=False):
+        rows = len(sheets[sheet_name]) - len(clean[sheet_name])
+        print(f"⚠ {sheet_name}: {rows} of {len(sheets[sheet_name])} rows quarantined")
+        for reason, count in sheet_quarantine['reason_code'].value_counts().items():
+            print(f"  - {reason}: {count}")
@@ -5,19 +5,14 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
+from compute_backend import aggregate_demand_stats, aggregate_sku_revenue
 
-def analyze_demand_patterns(sales_data, sku_master):
+def analyze_demand_patterns(sales_data, sku_master, backend='pandas'):
     """Analyze demand patterns for all SKUs"""
     print("Analyzing demand patterns...")
     
     # Calculate daily demand statistics by SKU and store
-    demand_stats = sales_data.groupby(['store_id', 'sku_id']).agg({
-        'quantity_sold': ['mean', 'std', 'sum', 'count', 'min', 'max']
-    }).round(2)
-    
-    demand_stats.columns = ['avg_daily_demand', 'demand_std', 'total_demand', 
-                           'days_sold', 'min_demand', 'max_demand']
-    demand_stats = demand_stats.reset_index()
+    demand_stats = aggregate_demand_stats(sales_data, backend).round(2)
     
     # Calculate coefficient of variation for demand variability
     demand_stats['cv'] = (demand_stats['demand_std'] / demand_stats['avg_daily_demand']).fillna(0)
@@ -42,18 +37,12 @@ def analyze_demand_patterns(sales_data, sku_master):
     
     return demand_analysis
 
-def abc_classification(sales_data, sku_master):
+def abc_classification(sales_data, sku_master, backend='pandas'):
     """Perform ABC classification based on revenue contribution"""
     print("Performing ABC classification...")
     
     # Calculate total revenue by SKU across all stores
-    sku_revenue = sales_data.merge(sku_master, on='sku_id')
-    sku_revenue['revenue'] = sku_revenue['quantity_sold'] * sku_revenue['unit_cost']
-    
-    abc_data = sku_revenue.groupby('sku_id').agg({
-        'quantity_sold': 'sum',
-        'revenue': 'sum'
-    }).reset_index()
+    abc_data = aggregate_sku_revenue(sales_data, sku_master, backend)
     
     # Sort by revenue (descending)
     abc_data = abc_data.sort_values('revenue', ascending=False)
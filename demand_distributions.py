@@ -0,0 +1,293 @@
+# demand_distributions.py
+# Demand Distribution Fitting Module
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+from scipy import stats
+
+DISTRIBUTION_FAMILIES = ['poisson', 'negative_binomial', 'zero_inflated_poisson', 'empirical']
+
+# Cells (rows x width) per batch of pairs in the histogram, sampling and FFT stages
+MAX_BATCH_CELLS = 1 << 22
+
+def _size_batches(sizes, row_cells, max_cells=MAX_BATCH_CELLS):
+    """Index arrays of pairs with similar sizes, each at most `max_cells` cells
+
+    Pairs are bucketed by the power of two above each of their `sizes`
+    (e.g. support width and lead time days), so a batch is never sized for
+    a much larger pair; buckets are split into chunks so that rows times the
+    bucket's largest `row_cells` stays within `max_cells`.
+    """
+    sizes = np.column_stack([np.asarray(size, dtype=float) for size in sizes])
+    classes = np.ceil(np.log2(np.maximum(sizes, 1))).astype(int)
+    _, bucket = np.unique(classes, axis=0, return_inverse=True)
+    row_cells = np.asarray(row_cells, dtype=float)
+
+    batches = []
+    for b in np.unique(bucket):
+        idx = np.flatnonzero(bucket.ravel() == b)
+        rows = max(int(max_cells // max(row_cells[idx].max(), 1)), 1)
+        batches.extend(idx[start:start + rows] for start in range(0, len(idx), rows))
+    return batches
+
+def fit_demand_distributions(sales_data, max_support=None):
+    """Fit a daily demand distribution for every store-SKU pair
+
+    Each pair's daily sales are reduced to a histogram, from which Poisson,
+    negative binomial and zero-inflated Poisson parameters are estimated by
+    method of moments. The family with the lowest AIC on the histogram is
+    selected, with the empirical (bootstrap) distribution as a candidate.
+    Pairs are fitted in batches of similar histogram width, so one fast
+    mover does not widen every pair's histogram. Demand above `max_support`
+    is counted in the top bin.
+    """
+    print("Fitting demand distributions...")
+
+    quantity = sales_data['quantity_sold'].round().clip(lower=0).astype(int).to_numpy()
+    if max_support is not None:
+        quantity = np.minimum(quantity, max_support)
+    pair_codes = sales_data.groupby(['store_id', 'sku_id']).ngroup().to_numpy()
+    pairs = (sales_data[['store_id', 'sku_id']].drop_duplicates()
+             .sort_values(['store_id', 'sku_id']).reset_index(drop=True))
+
+    pair_width = np.zeros(len(pairs), dtype=int)
+    np.maximum.at(pair_width, pair_codes, quantity + 1)
+
+    columns = ['dist_mean', 'dist_var', 'zero_fraction', 'nb_r', 'nb_p', 'zip_pi', 'zip_lambda', 'dist_aic']
+    fitted = {col: np.empty(len(pairs)) for col in columns}
+    family = np.empty(len(pairs), dtype=object)
+    empirical_pmf = [None] * len(pairs)
+
+    # Pre-aggregate daily sales into a pair x quantity histogram per batch
+    local = np.full(len(pairs), -1)
+    for idx in _size_batches([pair_width], pair_width):
+        local[idx] = np.arange(len(idx))
+        in_batch = local[pair_codes] >= 0
+        histogram = np.zeros((len(idx), pair_width[idx].max()))
+        np.add.at(histogram, (local[pair_codes[in_batch]], quantity[in_batch]), 1)
+        local[idx] = -1
+
+        batch = _fit_histograms(histogram)
+        for col in columns:
+            fitted[col][idx] = batch[col]
+        family[idx] = batch['dist_family']
+        for row, i in enumerate(idx):
+            empirical_pmf[i] = batch['empirical_pmf'][row, :pair_width[i]]
+
+    demand_distributions = pairs.copy()
+    demand_distributions['dist_family'] = family.astype(str)
+    demand_distributions['dist_mean'] = fitted['dist_mean']
+    demand_distributions['dist_var'] = fitted['dist_var']
+    demand_distributions['zero_fraction'] = fitted['zero_fraction']
+    demand_distributions['poisson_lambda'] = fitted['dist_mean']
+    demand_distributions['nb_r'] = fitted['nb_r']
+    demand_distributions['nb_p'] = fitted['nb_p']
+    demand_distributions['zip_pi'] = fitted['zip_pi']
+    demand_distributions['zip_lambda'] = fitted['zip_lambda']
+    demand_distributions['dist_aic'] = fitted['dist_aic']
+    demand_distributions['empirical_pmf'] = empirical_pmf
+
+    print(f"✓ Fitted demand distributions for {len(demand_distributions)} SKU-store combinations")
+    for family, count in demand_distributions['dist_family'].value_counts().items():
+        print(f"  {family}: {count}")
+
+    return demand_distributions
+
+def _fit_histograms(histogram):
+    """Method of moments fits and AIC family selection for a (pairs x quantity) histogram"""
+    k = np.arange(histogram.shape[1])
+
+    # Moments
+    n_obs = histogram.sum(axis=1)
+    mean = histogram @ k / n_obs
+    var = (histogram @ (k ** 2) / n_obs - mean ** 2) * n_obs / np.maximum(n_obs - 1, 1)
+    zero_fraction = histogram[:, 0] / n_obs
+    overdispersed = (var > mean) & (mean > 0)
+
+    # Method of moments estimates
+    nb_r = np.where(overdispersed, mean ** 2 / np.where(overdispersed, var - mean, 1), np.nan)
+    nb_p = np.where(overdispersed, mean / np.where(overdispersed, var, 1), np.nan)
+    zip_lambda = np.where(overdispersed, mean + var / np.where(mean > 0, mean, 1) - 1, np.nan)
+    zip_pi = np.where(overdispersed, 1 - mean / zip_lambda, np.nan)
+
+    # Log-likelihood of each family over the histogram
+    def _loglik(logpmf):
+        return np.where(histogram > 0, histogram * logpmf, 0).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loglik = np.column_stack([
+            _loglik(stats.poisson.logpmf(k, mean[:, None])),
+            np.where(overdispersed, _loglik(stats.nbinom.logpmf(k, nb_r[:, None], nb_p[:, None])), -np.inf),
+            np.where(overdispersed, _loglik(np.log(_zip_pmf(k, zip_pi[:, None], zip_lambda[:, None]))), -np.inf),
+            _loglik(np.log(histogram / n_obs[:, None]))
+        ])
+    n_params = np.column_stack([
+        np.ones(len(histogram)), np.full(len(histogram), 2), np.full(len(histogram), 2),
+        np.maximum((histogram > 0).sum(axis=1) - 1, 1)
+    ])
+    aic = 2 * n_params - 2 * loglik
+
+    return {
+        'dist_family': np.array(DISTRIBUTION_FAMILIES)[np.argmin(aic, axis=1)],
+        'dist_mean': mean, 'dist_var': var, 'zero_fraction': zero_fraction,
+        'nb_r': nb_r, 'nb_p': nb_p, 'zip_pi': zip_pi, 'zip_lambda': zip_lambda,
+        'dist_aic': aic.min(axis=1),
+        'empirical_pmf': histogram / n_obs[:, None]
+    }
+
+def _zip_pmf(k, pi, lam):
+    """Zero-inflated Poisson probability mass"""
+    return pi * (k == 0) + (1 - pi) * stats.poisson.pmf(k, lam)
+
+def support_width(demand_distributions, tail=1e-6):
+    """Number of quantity bins each pair's fitted family needs
+
+    Parametric supports extend until the upper tail falls below `tail`;
+    empirical supports are the length of the observed histogram.
+    """
+    family = demand_distributions['dist_family'].to_numpy()
+    upper = np.array([len(p) - 1 for p in demand_distributions['empirical_pmf']], dtype=float)
+
+    is_poisson = family == 'poisson'
+    upper[is_poisson] = stats.poisson.ppf(1 - tail, demand_distributions['poisson_lambda'].to_numpy(dtype=float)[is_poisson])
+    is_nb = family == 'negative_binomial'
+    upper[is_nb] = stats.nbinom.ppf(1 - tail, demand_distributions['nb_r'].to_numpy(dtype=float)[is_nb],
+                                    demand_distributions['nb_p'].to_numpy(dtype=float)[is_nb])
+    is_zip = family == 'zero_inflated_poisson'
+    upper[is_zip] = stats.poisson.ppf(1 - tail, demand_distributions['zip_lambda'].to_numpy(dtype=float)[is_zip])
+
+    return np.nan_to_num(upper).astype(int) + 1
+
+def daily_demand_pmf(demand_distributions, tail=1e-6):
+    """Probability mass matrix (pairs x quantity) of each pair's fitted family
+
+    The matrix is as wide as the widest pair's support (see support_width);
+    any mass beyond a pair's own support is added to its top bin. For many
+    pairs of mixed sizes use sample_fitted_demand and
+    fitted_lead_time_demand_quantile, which batch pairs by width.
+    """
+    family = demand_distributions['dist_family'].to_numpy()
+    lam = demand_distributions['poisson_lambda'].to_numpy(dtype=float)
+    nb_r = demand_distributions['nb_r'].to_numpy(dtype=float)
+    nb_p = demand_distributions['nb_p'].to_numpy(dtype=float)
+    zip_pi = demand_distributions['zip_pi'].to_numpy(dtype=float)
+    zip_lambda = demand_distributions['zip_lambda'].to_numpy(dtype=float)
+
+    width = support_width(demand_distributions, tail)
+    k = np.arange(width.max(initial=1))
+
+    pmf = np.zeros((len(family), len(k)))
+    is_empirical = family == 'empirical'
+    empirical = _stack_pmfs(demand_distributions['empirical_pmf'][is_empirical])
+    pmf[is_empirical, :empirical.shape[1]] = empirical
+
+    is_poisson = family == 'poisson'
+    pmf[is_poisson] = stats.poisson.pmf(k, lam[is_poisson, None])
+    is_nb = family == 'negative_binomial'
+    pmf[is_nb] = stats.nbinom.pmf(k, nb_r[is_nb, None], nb_p[is_nb, None])
+    is_zip = family == 'zero_inflated_poisson'
+    pmf[is_zip] = _zip_pmf(k, zip_pi[is_zip, None], zip_lambda[is_zip, None])
+
+    pmf[k >= width[:, None]] = 0
+    pmf[np.arange(len(pmf)), width - 1] += np.clip(1 - pmf.sum(axis=1), 0, None)
+    return pmf
+
+def _stack_pmfs(pmfs):
+    """Stack per-pair empirical pmfs into a zero-padded matrix"""
+    width = max((len(p) for p in pmfs), default=1)
+    stacked = np.zeros((len(pmfs), width))
+    for i, p in enumerate(pmfs):
+        stacked[i, :len(p)] = p
+    return stacked
+
+def sample_demand(pmf, days=1):
+    """Draw daily demand for every pair by inverting the cumulative pmf
+
+    Returns an array of shape (pairs, days).
+    """
+    cdf = np.cumsum(pmf, axis=1)
+    u = np.random.random((pmf.shape[0], days))
+    return (cdf[:, None, :] < u[:, :, None]).sum(axis=2).astype(float)
+
+def sample_fitted_demand(demand_distributions, days=1, tail=1e-6):
+    """Draw daily demand (pairs x days) from fitted distributions, batched by support width"""
+    width = support_width(demand_distributions, tail)
+    demand = np.zeros((len(demand_distributions), days))
+    for idx in _size_batches([width], width * days):
+        demand[idx] = sample_demand(daily_demand_pmf(demand_distributions.iloc[idx], tail), days)
+    return demand
+
+def lead_time_demand_quantile(pmf, lead_time, service_level, lead_time_std=None):
+    """Service level quantile of total demand over the lead time, for every pair
+
+    Daily pmfs are convolved over the lead time with FFTs. When
+    `lead_time_std` is given the lead time is treated as a discretised normal
+    variable and the result is a mixture over whole-day lead times. The FFT
+    is sized for the widest pmf and longest lead time passed in, so pairs of
+    very different sizes should go through fitted_lead_time_demand_quantile.
+    """
+    lead_time = np.asarray(lead_time, dtype=float)
+    service_level = np.asarray(service_level, dtype=float)
+    if lead_time_std is None:
+        lead_time_std = np.zeros_like(lead_time)
+    lead_time_std = np.nan_to_num(np.asarray(lead_time_std, dtype=float))
+
+    # Probability of each whole-day lead time 1..max_days
+    max_days = int(np.max(_lead_time_days(lead_time, lead_time_std), initial=1))
+    days = np.arange(1, max_days + 1)
+    spread = np.where(lead_time_std > 0, lead_time_std, 1)[:, None]
+    weights = np.where(
+        lead_time_std[:, None] > 0,
+        stats.norm.cdf((days + 0.5 - lead_time[:, None]) / spread) -
+        stats.norm.cdf((days - 0.5 - lead_time[:, None]) / spread),
+        days == np.clip(np.round(lead_time), 1, max_days)[:, None]
+    )
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    # Convolve in the frequency domain: pmf of an l-day total is fft(pmf) ** l
+    size = _fft_size(pmf.shape[1], max_days)
+    daily = np.fft.rfft(pmf, size, axis=1)
+    total = np.zeros_like(daily)
+    power = np.ones_like(daily)
+    for day in range(max_days):
+        power *= daily
+        total += weights[:, day, None] * power
+    lead_time_pmf = np.clip(np.fft.irfft(total, size, axis=1), 0, None)
+
+    cdf = np.cumsum(lead_time_pmf, axis=1)
+    cdf /= cdf[:, -1:]
+    return (cdf < service_level[:, None]).sum(axis=1).astype(float)
+
+def _lead_time_days(lead_time, lead_time_std):
+    """Longest whole-day lead time considered for each pair"""
+    return np.ceil(np.maximum(lead_time + 4 * lead_time_std, 1)).astype(int)
+
+def _fft_size(width, max_days):
+    """Power-of-two FFT length holding a `max_days`-fold sum of a `width`-bin pmf"""
+    return 1 << int(np.ceil(np.log2(max_days * (width - 1) + 1)))
+
+def fitted_lead_time_demand_quantile(demand_distributions, lead_time, service_level,
+                                     lead_time_std=None, tail=1e-6):
+    """lead_time_demand_quantile for fitted distributions, batched by support width and lead time
+
+    Each batch builds its pmf and FFT from its own widest support and longest
+    lead time, and is kept within MAX_BATCH_CELLS, so fast movers do not
+    inflate the arrays of every other pair.
+    """
+    lead_time = np.asarray(lead_time, dtype=float)
+    service_level = np.asarray(service_level, dtype=float)
+    lead_time_std = (np.zeros_like(lead_time) if lead_time_std is None
+                     else np.nan_to_num(np.asarray(lead_time_std, dtype=float)))
+
+    width = support_width(demand_distributions, tail)
+    max_days = _lead_time_days(lead_time, lead_time_std)
+    fft_cells = np.array([_fft_size(w, d) for w, d in zip(width, max_days)])
+
+    quantile = np.zeros(len(demand_distributions))
+    for idx in _size_batches([width, max_days], fft_cells):
+        quantile[idx] = lead_time_demand_quantile(
+            daily_demand_pmf(demand_distributions.iloc[idx], tail),
+            lead_time[idx], service_level[idx], lead_time_std[idx]
+        )
+    return quantile
@@ -5,9 +5,23 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
+from compute_backend import aggregate_kpi_data
+from demand_distributions import fitted_lead_time_demand_quantile
 
-def calculate_eoq_and_safety_stock(demand_analysis, abc_results):
-    """Calculate EOQ and safety stock for all SKUs"""
+def calculate_eoq_and_safety_stock(demand_analysis, abc_results, lead_time_stats=None,
+                                   perishable=False, demand_distributions=None):
+    """Calculate EOQ and safety stock for all SKUs
+
+    When `lead_time_stats` (from analyze_supplier_reliability) is given, its
+    mu_lead_time and sigma_lead_time replace SKU master's avg_lead_time as the
+    lead time distribution for safety stock and reorder point. SKUs without
+    enough purchase order history keep avg_lead_time, with a lead time std of
+    avg_lead_time times the median coefficient of variation of the others.
+    With `perishable=True` the order quantity is capped at what is expected to
+    sell within the SKU's shelf life. With `demand_distributions` (from
+    fit_demand_distributions) safety stock is taken from the fitted lead time
+    demand distribution instead of the normal approximation.
+    """
     print("Calculating EOQ and safety stock...")
     
     # Merge demand analysis with ABC classification
@@ -27,23 +41,76 @@ def calculate_eoq_and_safety_stock(demand_analysis, abc_results):
         inventory_model['annual_holding_cost']
     ).round(0)
     
+    # Perishable mode: never order more than sells before expiry
+    if perishable:
+        # (at least one unit, so slow movers can still be ordered)
+        inventory_model['shelf_life_cap'] = np.floor(
+            inventory_model['shelf_life_days'] * inventory_model['avg_daily_demand']
+        ).clip(lower=1)
+        inventory_model['eoq_unconstrained'] = inventory_model['eoq']
+        inventory_model['eoq'] = np.minimum(inventory_model['eoq'], inventory_model['shelf_life_cap'])
+        inventory_model['shelf_life_constrained'] = (
+            inventory_model['eoq_unconstrained'] > inventory_model['shelf_life_cap']
+        )
+    
     # Safety stock calculation
     inventory_model['z_score'] = inventory_model['target_service_level'].apply(
         lambda x: stats.norm.ppf(x) if x < 1 else 2.33
     )
     
-    # Lead time demand standard deviation
-    inventory_model['lead_time_demand_std'] = (
-        inventory_model['demand_std'] * np.sqrt(inventory_model['avg_lead_time'])
-    )
+    # Lead time distribution: purchase order history when available, else SKU master
+    if lead_time_stats is None:
+        inventory_model['lead_time_days'] = inventory_model['avg_lead_time']
+        
+        inventory_model['lead_time_demand_std'] = (
+            inventory_model['demand_std'] * np.sqrt(inventory_model['lead_time_days'])
+        )
+    else:
+        inventory_model = inventory_model.merge(
+            lead_time_stats[['sku_id', 'mu_lead_time', 'sigma_lead_time']], on='sku_id', how='left'
+        )
+        inventory_model['lead_time_days'] = (
+            inventory_model['mu_lead_time'].fillna(inventory_model['avg_lead_time'])
+        )
+        lead_time_cv = (lead_time_stats['sigma_lead_time'] / lead_time_stats['mu_lead_time']).median()
+        inventory_model['sigma_lead_time'] = inventory_model['sigma_lead_time'].fillna(
+            inventory_model['avg_lead_time'] * (0 if pd.isna(lead_time_cv) else lead_time_cv)
+        )
+        
+        # sqrt(LT * σ_d² + d² * σ_LT²), with LT and σ_LT from the same PO history
+        inventory_model['lead_time_demand_std'] = np.sqrt(
+            inventory_model['lead_time_days'] * inventory_model['demand_std'] ** 2 +
+            inventory_model['avg_daily_demand'] ** 2 * inventory_model['sigma_lead_time'] ** 2
+        )
     
     inventory_model['safety_stock'] = (
         inventory_model['z_score'] * inventory_model['lead_time_demand_std']
     ).round(0).clip(lower=0)
     
+    # Distribution-based safety stock: lead time demand quantile less its mean
+    if demand_distributions is not None:
+        fitted = inventory_model[['store_id', 'sku_id']].merge(
+            demand_distributions, on=['store_id', 'sku_id'], how='left'
+        )
+        has_fit = fitted['dist_family'].notna().to_numpy()
+        if has_fit.any():
+            lead_time_std = (inventory_model['sigma_lead_time'][has_fit]
+                             if 'sigma_lead_time' in inventory_model else None)
+            quantile = fitted_lead_time_demand_quantile(
+                fitted[has_fit],
+                inventory_model['lead_time_days'][has_fit],
+                inventory_model['target_service_level'][has_fit],
+                lead_time_std
+            )
+            lead_time_mean = (
+                inventory_model['avg_daily_demand'][has_fit] * inventory_model['lead_time_days'][has_fit]
+            )
+            inventory_model.loc[has_fit, 'safety_stock'] = (quantile - lead_time_mean).round(0).clip(lower=0)
+        inventory_model['dist_family'] = fitted['dist_family'].fillna('normal').to_numpy()
+    
     # Reorder point calculation
     inventory_model['lead_time_demand'] = (
-        inventory_model['avg_daily_demand'] * inventory_model['avg_lead_time']
+        inventory_model['avg_daily_demand'] * inventory_model['lead_time_days']
     )
     inventory_model['reorder_point'] = (
         inventory_model['lead_time_demand'] + inventory_model['safety_stock']
@@ -55,8 +122,9 @@ def calculate_eoq_and_safety_stock(demand_analysis, abc_results):
     )
     
     # Calculate total annual costs
-    inventory_model['annual_ordering_cost'] = (
-        inventory_model['annual_demand'] / inventory_model['eoq'] * ordering_cost
+    inventory_model['annual_ordering_cost'] = np.divide(
+        inventory_model['annual_demand'] * ordering_cost, inventory_model['eoq'],
+        out=np.zeros(len(inventory_model)), where=inventory_model['eoq'] > 0
     )
     inventory_model['annual_holding_cost_total'] = (
         (inventory_model['eoq'] / 2 + inventory_model['safety_stock']) * 
@@ -68,39 +136,35 @@ def calculate_eoq_and_safety_stock(demand_analysis, abc_results):
     )
     
     print(f"✓ EOQ calculations completed for {len(inventory_model)} combinations")
+    if perishable:
+        print(f"✓ Shelf life caps applied to {inventory_model['shelf_life_constrained'].sum()} combinations")
     
     return inventory_model
 
-def calculate_current_performance_kpis(sales_data, inventory_data, sku_master):
-    """Calculate current inventory performance KPIs"""
+def calculate_current_performance_kpis(sales_data, inventory_data, sku_master, backend='pandas',
+                                       daily_stock=None):
+    """Calculate current inventory performance KPIs
+
+    With `daily_stock` (from detect_stockouts_and_correct_demand) stockouts
+    are the reconstructed out-of-stock days rather than every zero-sale day.
+    """
     print("Calculating current performance KPIs...")
     
-    # Merge sales with inventory data
-    current_performance = sales_data.merge(sku_master, on='sku_id')
-    current_performance = current_performance.merge(inventory_data, on=['store_id', 'sku_id'])
-    
-    # Calculate revenue
-    current_performance['revenue'] = current_performance['quantity_sold'] * current_performance['unit_cost']
-    
-    # Aggregate by store and SKU
-    kpi_data = current_performance.groupby(['store_id', 'sku_id']).agg({
-        'quantity_sold': ['sum', 'mean'],
-        'revenue': 'sum',
-        'current_stock': 'first',
-        'unit_cost': 'first'
-    }).reset_index()
-    
-    kpi_data.columns = ['store_id', 'sku_id', 'total_sold', 'avg_daily_sales', 
-                       'total_revenue', 'current_stock', 'unit_cost']
+    # Merge sales with SKU and inventory data, then aggregate by store and SKU
+    kpi_data, stockout_events, total_records = aggregate_kpi_data(
+        sales_data, inventory_data, sku_master, backend
+    )
     
     # Calculate KPIs
     kpi_data['inventory_value'] = kpi_data['current_stock'] * kpi_data['unit_cost']
     kpi_data['days_of_supply'] = kpi_data['current_stock'] / kpi_data['avg_daily_sales']
     kpi_data['inventory_turnover'] = (kpi_data['total_sold'] * 4) / kpi_data['current_stock']  # Annualized
     
-    # Stock out analysis (assuming 0 sales = stock out)
-    stockout_analysis = sales_data[sales_data['quantity_sold'] == 0]
-    stockout_rate = len(stockout_analysis) / len(sales_data) * 100
+    # Stock out analysis (assuming 0 sales = stock out unless stock was reconstructed)
+    if daily_stock is not None:
+        stockout_events = int(daily_stock['stockout'].sum())
+        total_records = len(daily_stock)
+    stockout_rate = stockout_events / total_records * 100
     
     # Overall KPIs
     overall_kpis = {
@@ -108,7 +172,7 @@ def calculate_current_performance_kpis(sales_data, inventory_data, sku_master):
         'avg_inventory_turnover': kpi_data['inventory_turnover'].mean(),
         'total_inventory_value': kpi_data['inventory_value'].sum(),
         'avg_days_supply': kpi_data['days_of_supply'].mean(),
-        'stockout_events': len(stockout_analysis)
+        'stockout_events': stockout_events
     }
     
     print(f"✓ Current fill rate: {overall_kpis['fill_rate']:.1f}%")
@@ -10,11 +10,22 @@ warnings.filterwarnings('ignore')
 
 # Import custom modules
 from data_loader import load_and_prepare_data
+from stockout_analysis import detect_stockouts_and_correct_demand, corrected_sales_data
 from demand_analysis import analyze_demand_patterns, abc_classification
+from demand_distributions import fit_demand_distributions
+from supplier_analysis import analyze_supplier_reliability
 from inventory_models import calculate_eoq_and_safety_stock, calculate_current_performance_kpis
-from cost_benefit import calculate_cost_benefit_analysis, simulate_inventory_performance
+from rebalancing import optimize_stock_rebalancing
+from cost_benefit import (calculate_cost_benefit_analysis, simulate_inventory_performance,
+                          simulate_perishable_inventory)
 from report_generator import generate_executive_summary, create_dashboard_summary, export_results
 
+# Compute backend for the aggregation stages: 'pandas', 'duckdb' or 'polars'
+COMPUTE_BACKEND = 'pandas'
+
+# Cap order quantities by shelf life and simulate expiry (for perishable assortments)
+PERISHABLE_MODE = False
+
 def main():
     """Main execution function"""
     print("=" * 60)
@@ -23,42 +34,74 @@ def main():
     
     # Step 1: Load and prepare data
     print("\n1. LOADING DATA...")
-    sales_data, inventory_data, sku_master, purchase_orders, supplier_data = load_and_prepare_data()
+    (sales_data, inventory_data, sku_master, purchase_orders,
+     supplier_data, quarantine) = load_and_prepare_data(return_quarantine=True)
+    
+    # Step 2: Detect true stockouts and correct censored demand
+    print("\n2. DETECTING STOCKOUTS...")
+    daily_stock = detect_stockouts_and_correct_demand(sales_data, inventory_data, purchase_orders)
+    demand_data = corrected_sales_data(daily_stock)
+    
+    # Step 3: Analyze demand patterns
+    print("\n3. ANALYZING DEMAND PATTERNS...")
+    demand_analysis = analyze_demand_patterns(demand_data, sku_master, COMPUTE_BACKEND)
     
-    # Step 2: Analyze demand patterns
-    print("\n2. ANALYZING DEMAND PATTERNS...")
-    demand_analysis = analyze_demand_patterns(sales_data, sku_master)
+    # Step 4: Fit demand distributions
+    print("\n4. FITTING DEMAND DISTRIBUTIONS...")
+    demand_distributions = fit_demand_distributions(demand_data)
     
-    # Step 3: Perform ABC classification
-    print("\n3. PERFORMING ABC CLASSIFICATION...")
-    abc_results, abc_summary = abc_classification(sales_data, sku_master)
+    # Step 5: Perform ABC classification
+    print("\n5. PERFORMING ABC CLASSIFICATION...")
+    abc_results, abc_summary = abc_classification(sales_data, sku_master, COMPUTE_BACKEND)
     
-    # Step 4: Calculate inventory model parameters
-    print("\n4. CALCULATING INVENTORY MODEL...")
-    inventory_model = calculate_eoq_and_safety_stock(demand_analysis, abc_results)
+    # Step 6: Analyze supplier reliability
+    print("\n6. ANALYZING SUPPLIER RELIABILITY...")
+    lead_time_stats, supplier_stats = analyze_supplier_reliability(purchase_orders, supplier_data)
+    
+    # Step 7: Calculate inventory model parameters
+    print("\n7. CALCULATING INVENTORY MODEL...")
+    inventory_model = calculate_eoq_and_safety_stock(
+        demand_analysis, abc_results, lead_time_stats, perishable=PERISHABLE_MODE,
+        demand_distributions=demand_distributions
+    )
+    
+    # Step 8: Calculate current performance KPIs
+    print("\n8. CALCULATING CURRENT KPIS...")
+    current_kpis = calculate_current_performance_kpis(
+        sales_data, inventory_data, sku_master, COMPUTE_BACKEND, daily_stock=daily_stock
+    )
     
-    # Step 5: Calculate current performance KPIs
-    print("\n5. CALCULATING CURRENT KPIS...")
-    current_kpis = calculate_current_performance_kpis(sales_data, inventory_data, sku_master)
+    # Step 9: Plan inter-store stock transfers
+    print("\n9. REBALANCING STORE STOCK...")
+    transfer_plan, rebalance_summary = optimize_stock_rebalancing(inventory_model, inventory_data)
     
-    # Step 6: Perform cost-benefit analysis
-    print("\n6. COST-BENEFIT ANALYSIS...")
+    # Step 10: Perform cost-benefit analysis
+    print("\n10. COST-BENEFIT ANALYSIS...")
     cost_benefit = calculate_cost_benefit_analysis(inventory_model, current_kpis)
     
-    # Step 7: Run simulation
-    print("\n7. RUNNING SIMULATION...")
-    simulation_results, simulation_summary = simulate_inventory_performance(inventory_model, sales_data)
+    # Step 11: Run simulation
+    print("\n11. RUNNING SIMULATION...")
+    if PERISHABLE_MODE:
+        simulation_results, simulation_summary = simulate_perishable_inventory(
+            inventory_model, demand_distributions=demand_distributions
+        )
+    else:
+        simulation_results, simulation_summary = simulate_inventory_performance(
+            inventory_model, sales_data, demand_distributions=demand_distributions
+        )
     
-    # Step 8: Generate reports
-    print("\n8. GENERATING REPORTS...")
+    # Step 12: Generate reports
+    print("\n12. GENERATING REPORTS...")
     executive_summary = generate_executive_summary()
     dashboard_data = create_dashboard_summary()
     
-    # Step 9: Export results
-    print("\n9. EXPORTING RESULTS...")
+    # Step 13: Export results
+    print("\n13. EXPORTING RESULTS...")
     export_results(
         demand_analysis, abc_results, inventory_model, 
-        simulation_results, cost_benefit, dashboard_data
+        simulation_results, cost_benefit, dashboard_data,
+        supplier_stats=supplier_stats, demand_distributions=demand_distributions,
+        transfer_plan=transfer_plan, quarantine=quarantine
     )
     
     print("\n" + "=" * 60)
@@ -0,0 +1,189 @@
+# rebalancing.py
+# Inter-Store Stock Rebalancing Module
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+TRANSFER_PLAN_COLUMNS = ['sku_id', 'from_store', 'to_store', 'transfer_qty',
+                         'unit_transfer_cost', 'transfer_cost']
+
+def calculate_store_balances(inventory_model, inventory_data):
+    """Surplus above max_inventory and deficit below reorder_point per store-SKU pair
+
+    Surplus is measured above the larger of max_inventory and reorder_point,
+    so a pair is never both a donor and a receiver.
+    """
+    balances = inventory_model[['store_id', 'sku_id', 'reorder_point', 'max_inventory']].merge(
+        inventory_data[['store_id', 'sku_id', 'current_stock']], on=['store_id', 'sku_id'], how='inner'
+    )
+    keep_level = np.maximum(balances['max_inventory'], balances['reorder_point'])
+    balances['surplus'] = np.floor(
+        (balances['current_stock'] - keep_level).clip(lower=0)
+    )
+    balances['deficit'] = np.ceil(
+        (balances['reorder_point'] - balances['current_stock']).clip(lower=0)
+    )
+    return balances
+
+def optimize_stock_rebalancing(inventory_model, inventory_data, transfer_costs=None,
+                               method=None, max_candidates=10):
+    """Plan inter-store transfers of surplus stock to stores short of their reorder point
+
+    `transfer_costs` is an optional store x store DataFrame of per-unit costs
+    (rows: from_store, columns: to_store; NaN means no route). `method` is
+    'greedy' (vectorized matching of largest donors to largest receivers,
+    per SKU, ignoring routes: matches without a route are dropped) or
+    'min_cost_flow' (sparse LPs over all SKUs that move as many units as
+    possible, then at least cost, considering each receiver's
+    `max_candidates` cheapest donors). By default the min-cost flow is used
+    when a cost matrix is given.
+    """
+    print("Optimizing inter-store stock rebalancing...")
+
+    if method is None:
+        method = 'greedy' if transfer_costs is None else 'min_cost_flow'
+    if method not in ('greedy', 'min_cost_flow'):
+        raise ValueError(f"Unknown rebalancing method '{method}'. Choose 'greedy' or 'min_cost_flow'")
+    if method == 'min_cost_flow' and transfer_costs is None:
+        raise ValueError("The 'min_cost_flow' method requires a transfer_costs matrix")
+
+    balances = calculate_store_balances(inventory_model, inventory_data)
+    donors = (balances[balances['surplus'] > 0]
+              .sort_values(['sku_id', 'surplus', 'store_id'], ascending=[True, False, True])
+              .reset_index(drop=True))
+    receivers = (balances[balances['deficit'] > 0]
+                 .sort_values(['sku_id', 'deficit', 'store_id'], ascending=[True, False, True])
+                 .reset_index(drop=True))
+
+    if method == 'greedy':
+        transfer_plan = _greedy_transfers(donors, receivers)
+        transfer_plan = _attach_transfer_costs(transfer_plan, transfer_costs)
+        
+        # The greedy match ignores routes; drop transfers the cost matrix has no route for
+        no_route = transfer_plan['unit_transfer_cost'].isna()
+        if no_route.any():
+            print(f"⚠ {no_route.sum()} greedy transfers ({transfer_plan.loc[no_route, 'transfer_qty'].sum():,.0f} units) "
+                  f"dropped: no route in transfer_costs")
+            transfer_plan = transfer_plan[~no_route]
+    else:
+        transfer_plan = _min_cost_flow_transfers(donors, receivers, transfer_costs, max_candidates)
+
+    transfer_plan = transfer_plan[TRANSFER_PLAN_COLUMNS].reset_index(drop=True)
+
+    units_moved = transfer_plan['transfer_qty'].sum()
+    rebalance_summary = {
+        'method': method,
+        'transfers': len(transfer_plan),
+        'units_transferred': units_moved,
+        'skus_rebalanced': transfer_plan['sku_id'].nunique(),
+        'total_transfer_cost': transfer_plan['transfer_cost'].sum(),
+        'total_deficit_units': balances['deficit'].sum(),
+        'unresolved_deficit_units': balances['deficit'].sum() - units_moved,
+        'remaining_surplus_units': balances['surplus'].sum() - units_moved
+    }
+
+    print(f"✓ {rebalance_summary['transfers']} transfers planned "
+          f"({units_moved:,.0f} units across {rebalance_summary['skus_rebalanced']} SKUs)")
+    print(f"✓ Unresolved deficit: {rebalance_summary['unresolved_deficit_units']:,.0f} units")
+
+    return transfer_plan, rebalance_summary
+
+def _greedy_transfers(donors, receivers):
+    """Match donors to receivers per SKU in one pass over all SKUs
+
+    Within each SKU, donor surplus and receiver deficit are laid end to end
+    on a line of length min(total surplus, total deficit); SKUs are placed
+    one after another. Every overlap between a donor interval and a receiver
+    interval is one transfer.
+    """
+    skus = pd.Index(pd.concat([donors['sku_id'], receivers['sku_id']]).unique()).sort_values()
+    donor_sku = skus.get_indexer(donors['sku_id'])
+    receiver_sku = skus.get_indexer(receivers['sku_id'])
+
+    total_surplus = np.bincount(donor_sku, weights=donors['surplus'], minlength=len(skus))
+    total_deficit = np.bincount(receiver_sku, weights=receivers['deficit'], minlength=len(skus))
+    matched = np.minimum(total_surplus, total_deficit)
+    base = np.concatenate([[0], np.cumsum(matched)[:-1]])
+
+    def _interval_ends(frame, sku_codes, column):
+        within = frame.groupby('sku_id', sort=False)[column].cumsum().to_numpy()
+        return base[sku_codes] + np.minimum(within, matched[sku_codes])
+
+    donor_ends = _interval_ends(donors, donor_sku, 'surplus')
+    receiver_ends = _interval_ends(receivers, receiver_sku, 'deficit')
+
+    breakpoints = np.unique(np.concatenate([[0], donor_ends, receiver_ends]))
+    starts = breakpoints[:-1]
+    quantities = np.diff(breakpoints)
+
+    donor_idx = np.searchsorted(donor_ends, starts, side='right')
+    receiver_idx = np.searchsorted(receiver_ends, starts, side='right')
+
+    return pd.DataFrame({
+        'sku_id': donors['sku_id'].to_numpy()[donor_idx],
+        'from_store': donors['store_id'].to_numpy()[donor_idx],
+        'to_store': receivers['store_id'].to_numpy()[receiver_idx],
+        'transfer_qty': quantities
+    })
+
+def _cost_table(transfer_costs):
+    """Long (from_store, to_store, unit_transfer_cost) table from a cost matrix"""
+    costs = transfer_costs.rename_axis(index='from_store', columns='to_store').stack()
+    return costs.rename('unit_transfer_cost').reset_index().dropna(subset=['unit_transfer_cost'])
+
+def _attach_transfer_costs(transfer_plan, transfer_costs):
+    """Add per-unit and total transfer costs to a plan"""
+    if transfer_costs is None:
+        transfer_plan['unit_transfer_cost'] = 0.0
+    else:
+        transfer_plan = transfer_plan.merge(_cost_table(transfer_costs),
+                                            on=['from_store', 'to_store'], how='left')
+    transfer_plan['transfer_cost'] = transfer_plan['transfer_qty'] * transfer_plan['unit_transfer_cost']
+    return transfer_plan
+
+def _min_cost_flow_transfers(donors, receivers, transfer_costs, max_candidates):
+    """Transportation LPs over all SKUs: maximise units moved, then minimise cost at that flow"""
+    # Candidate routes: each receiver's cheapest donors of the same SKU
+    edges = receivers[['sku_id', 'store_id']].reset_index().rename(
+        columns={'index': 'receiver', 'store_id': 'to_store'}
+    ).merge(
+        donors[['sku_id', 'store_id']].reset_index().rename(
+            columns={'index': 'donor', 'store_id': 'from_store'}
+        ), on='sku_id'
+    )
+    edges = edges[edges['from_store'] != edges['to_store']]
+    edges = edges.merge(_cost_table(transfer_costs), on=['from_store', 'to_store'], how='inner')
+    edges = edges[edges.groupby('receiver')['unit_transfer_cost']
+                  .rank(method='first') <= max_candidates].reset_index(drop=True)
+
+    if edges.empty:
+        return pd.DataFrame(columns=TRANSFER_PLAN_COLUMNS)
+
+    n_edges = len(edges)
+    edge_ids = np.arange(n_edges)
+    constraints = sparse.vstack([
+        sparse.csr_matrix((np.ones(n_edges), (edges['donor'], edge_ids)), shape=(len(donors), n_edges)),
+        sparse.csr_matrix((np.ones(n_edges), (edges['receiver'], edge_ids)), shape=(len(receivers), n_edges))
+    ])
+    limits = np.concatenate([donors['surplus'].to_numpy(), receivers['deficit'].to_numpy()])
+
+    # Phase 1: the largest number of units that can be moved
+    result = linprog(-np.ones(n_edges), A_ub=constraints, b_ub=limits, bounds=(0, None), method='highs')
+    if not result.success:
+        raise RuntimeError(f"Rebalancing optimization failed: {result.message}")
+    max_flow = np.round(-result.fun)
+
+    # Phase 2: the cheapest way to move exactly that many units
+    unit_cost = edges['unit_transfer_cost'].to_numpy(dtype=float)
+    result = linprog(unit_cost, A_ub=constraints, b_ub=limits, A_eq=np.ones((1, n_edges)), b_eq=[max_flow],
+                     bounds=(0, None), method='highs')
+    if not result.success:
+        raise RuntimeError(f"Rebalancing optimization failed: {result.message}")
+
+    edges['transfer_qty'] = np.round(result.x)
+    edges = edges[edges['transfer_qty'] > 0]
+    edges['transfer_cost'] = edges['transfer_qty'] * edges['unit_transfer_cost']
+    return edges.sort_values(['sku_id', 'from_store', 'to_store'])
@@ -94,7 +94,9 @@ def create_dashboard_summary():
     return dashboard_data
 
 def export_results(demand_analysis, abc_results, inventory_model, 
-                  simulation_results, cost_benefit, dashboard_data):
+                  simulation_results, cost_benefit, dashboard_data,
+                  supplier_stats=None, demand_distributions=None, transfer_plan=None,
+                  quarantine=None):
     """Export all results to Excel file"""
     print("Exporting results to Excel...")
     
@@ -110,6 +112,20 @@ def export_results(demand_analysis, abc_results, inventory_model,
             # Export inventory model recommendations
             inventory_model.to_excel(writer, sheet_name='Inventory_Model', index=False)
             
+            # Export fitted demand distributions
+            if demand_distributions is not None:
+                demand_distributions.drop(columns='empirical_pmf').to_excel(
+                    writer, sheet_name='Demand_Distributions', index=False
+                )
+            
+            # Export supplier reliability
+            if supplier_stats is not None:
+                supplier_stats.to_excel(writer, sheet_name='Supplier_Reliability', index=False)
+            
+            # Export inter-store transfer plan
+            if transfer_plan is not None:
+                transfer_plan.to_excel(writer, sheet_name='Transfer_Plan', index=False)
+            
             # Export simulation results
             simulation_results.to_excel(writer, sheet_name='Simulation_Results', index=False)
             
@@ -123,6 +139,10 @@ def export_results(demand_analysis, abc_results, inventory_model,
             dashboard_df.index = ['Current', 'Target']
             dashboard_df.to_excel(writer, sheet_name='Dashboard_Summary')
             
+            # Export quarantined rows from data validation
+            if quarantine is not None and not quarantine.empty:
+                quarantine.to_excel(writer, sheet_name='Data_Quarantine', index=False)
+            
             # Create summary sheet
             create_summary_sheet(writer, inventory_model, cost_benefit)
             
@@ -0,0 +1,110 @@
+# supplier_analysis.py
+# Supplier Reliability Analysis Module
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+
+def rolling_lead_time_stats(po, key, window_days=30):
+    """Rolling lead time and on-time statistics at every purchase order
+
+    For each order, statistics cover the orders of the same `key` (sku_id or
+    supplier_id) placed in the `window_days` days up to and including it.
+    """
+    po = po.sort_values([key, 'order_date', 'po_id'])
+    window = f'{window_days}D'
+    rolling = po.groupby(key).rolling(window, on='order_date')
+
+    history = po[[key, 'po_id', 'order_date', 'lead_time', 'on_time']].reset_index(drop=True)
+    history['window_po_count'] = rolling['lead_time'].count().to_numpy().astype(int)
+    history['window_lead_time_mean'] = rolling['lead_time'].mean().to_numpy()
+    history['window_lead_time_std'] = rolling['lead_time'].std().to_numpy()
+    history['window_on_time_rate'] = rolling['on_time'].mean().to_numpy()
+    return history
+
+def _summarize(po, key, window_days):
+    """Full-history statistics plus the rolling window at the latest order, by key"""
+    summary = po.groupby(key).agg(
+        po_count=('po_id', 'count'),
+        lead_time_mean=('lead_time', 'mean'),
+        lead_time_std=('lead_time', 'std'),
+        on_time_rate=('on_time', 'mean')
+    )
+    summary['lead_time_var'] = summary['lead_time_std'] ** 2
+
+    history = rolling_lead_time_stats(po, key, window_days)
+    latest = history.groupby(key).last()[['window_po_count', 'window_lead_time_mean',
+                                          'window_lead_time_std', 'window_on_time_rate']]
+    return summary.join(latest).reset_index(), history
+
+def analyze_supplier_reliability(purchase_orders, supplier_data, window_days=30, return_history=False,
+                                 min_po_count=4):
+    """Calculate lead time and on-time statistics by SKU and by supplier
+
+    Full-history statistics are reported alongside rolling `window_days`
+    statistics (the window ending at each key's most recent order). The SKU
+    table carries `mu_lead_time` and `sigma_lead_time` for safety stock: the
+    rolling window values when the window holds at least `min_po_count`
+    orders, else the full history when it does, else NaN (the SKU master
+    lead time is then used downstream); `lead_time_source` records which.
+    With `return_history=True` the per-order rolling tables for SKUs and
+    suppliers are returned as well.
+    """
+    print("Analyzing supplier reliability...")
+
+    po = purchase_orders.merge(
+        supplier_data[['sku_id', 'supplier_id', 'service_level', 'delay_rate']],
+        on='sku_id', how='left'
+    )
+
+    # Observed lead times and on-time flags when receipts are recorded,
+    # otherwise the expected lead time and the supplier's on-time rate
+    if 'actual_delivery_date' in po.columns:
+        actual_delivery = pd.to_datetime(po['actual_delivery_date'])
+        received = actual_delivery.notna()
+        po['lead_time'] = po['order_lead_time'].where(
+            ~received, (actual_delivery - po['order_date']).dt.days
+        )
+        po['on_time'] = np.where(received, actual_delivery <= po['expected_delivery_date'],
+                                 1 - po['delay_rate'])
+    else:
+        po['lead_time'] = po['order_lead_time']
+        po['on_time'] = 1 - po['delay_rate']
+    po['lead_time'] = po['lead_time'].astype(float)
+    po['on_time'] = po['on_time'].astype(float)
+
+    # SKU-level statistics
+    sku_stats, sku_history = _summarize(po, 'sku_id', window_days)
+    sku_stats.insert(1, 'supplier_id', sku_stats['sku_id'].map(
+        po.groupby('sku_id')['supplier_id'].first()
+    ))
+
+    # Lead time distribution used for safety stock, only from enough orders
+    use_window = sku_stats['window_po_count'] >= min_po_count
+    use_history = ~use_window & (sku_stats['po_count'] >= min_po_count)
+    sku_stats['lead_time_source'] = np.select([use_window, use_history], ['window', 'history'], 'sku_master')
+    sku_stats['mu_lead_time'] = (sku_stats['window_lead_time_mean'].where(use_window)
+                                 .fillna(sku_stats['lead_time_mean'].where(use_history)))
+    sku_stats['sigma_lead_time'] = (sku_stats['window_lead_time_std'].where(use_window)
+                                    .fillna(sku_stats['lead_time_std'].where(use_history)))
+
+    # Supplier-level statistics
+    supplier_stats, supplier_history = _summarize(po.dropna(subset=['supplier_id']), 'supplier_id', window_days)
+    supplier_stats.insert(1, 'sku_count', supplier_stats['supplier_id'].map(
+        po.groupby('supplier_id')['sku_id'].nunique()
+    ))
+
+    sku_stats = sku_stats.round(3)
+    supplier_stats = supplier_stats.round(3)
+
+    print(f"✓ Lead time statistics for {len(sku_stats)} SKUs from {len(po)} purchase orders "
+          f"({window_days}-day rolling window)")
+    print(f"✓ Supplier reliability for {len(supplier_stats)} suppliers")
+    print(f"✓ Lead time source: {(sku_stats['lead_time_source'] == 'window').sum()} rolling window, "
+          f"{(sku_stats['lead_time_source'] == 'history').sum()} full history, "
+          f"{(sku_stats['lead_time_source'] == 'sku_master').sum()} SKU master "
+          f"(fewer than {min_po_count} orders)")
+
+    if return_history:
+        return sku_stats, supplier_stats, sku_history, supplier_history
+    return sku_stats, supplier_stats
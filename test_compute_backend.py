@@ -0,0 +1,38 @@
+# test_compute_backend.py
+# Compute Backend Parity Tests
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+import pytest
+from compute_backend import compare_backends
+
+def _sample_tables():
+    """Small sales, inventory and SKU tables with zero-sale days"""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range('2024-01-01', periods=30, freq='D')
+    stores = ['S1', 'S2', 'S3']
+    skus = [f'P{i:04d}' for i in range(1, 6)]
+    index = pd.MultiIndex.from_product([dates, stores, skus], names=['date', 'store_id', 'sku_id'])
+    sales_data = index.to_frame(index=False)
+    sales_data['quantity_sold'] = rng.poisson(3, len(sales_data)).astype('int64')
+
+    sku_master = pd.DataFrame({'sku_id': skus, 'unit_cost': rng.uniform(10, 500, len(skus)).round(2)})
+    inventory_data = pd.MultiIndex.from_product([stores, skus], names=['store_id', 'sku_id']).to_frame(index=False)
+    inventory_data['current_stock'] = rng.integers(0, 200, len(inventory_data))
+    return sales_data, inventory_data, sku_master
+
+@pytest.mark.parametrize('backend', ['duckdb', 'polars'])
+@pytest.mark.parametrize('source', ['dataframe', 'parquet'])
+def test_backend_matches_pandas(backend, source, tmp_path):
+    pytest.importorskip(backend)
+    sales_data, inventory_data, sku_master = _sample_tables()
+    if source == 'parquet':
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / 'sales.parquet')
+        sales_data.to_parquet(path)
+        sales_data = path
+
+    results = compare_backends(sales_data, inventory_data, sku_master, backend)
+
+    assert results == {'demand_stats': True, 'sku_revenue': True, 'kpi_data': True}
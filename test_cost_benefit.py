@@ -0,0 +1,48 @@
+# test_cost_benefit.py
+# Plan Evaluator Tests
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+import pytest
+from cost_benefit import PlanEvaluator, calculate_cost_benefit_analysis, calculate_working_capital_impact
+
+def _sample_model():
+    """Inventory model with several stores per SKU, and current KPIs"""
+    rng = np.random.default_rng(11)
+    model = pd.MultiIndex.from_product([['S1', 'S2', 'S3'], ['P1001', 'P1002', 'P1003', 'P1004']],
+                                       names=['store_id', 'sku_id']).to_frame(index=False)
+    unit_cost = {'P1001': 120.0, 'P1002': 45.5, 'P1003': 310.0, 'P1004': 18.25}
+    model['unit_cost'] = model['sku_id'].map(unit_cost)
+    model['max_inventory'] = rng.integers(20, 200, len(model)).astype(float)
+    model['total_annual_cost'] = rng.uniform(100, 1000, len(model))
+    model['abc_class'] = 'A'
+    model['annual_revenue'] = rng.uniform(1e4, 1e5, len(model))
+    current_kpis = {'total_inventory_value': 150000.0, 'fill_rate': 93.5}
+    return model, current_kpis
+
+def test_baseline_plan_matches_single_plan_functions():
+    model, current_kpis = _sample_model()
+    cost_benefit = calculate_cost_benefit_analysis(model, current_kpis)
+    working_capital = calculate_working_capital_impact(model, current_kpis)
+
+    result = PlanEvaluator(model, current_kpis).evaluate().iloc[0]
+
+    for name in ['proposed_inventory_value', 'inventory_reduction', 'holding_cost_savings',
+                 'total_annual_savings', 'roi_percentage', 'payback_months']:
+        assert result[name] == pytest.approx(cost_benefit[name])
+    for name in ['wc_reduction_percentage', 'opportunity_cost_savings']:
+        assert result[name] == pytest.approx(working_capital[name])
+
+def test_batches_through_small_cache_match_single_evaluations():
+    model, current_kpis = _sample_model()
+    baseline = model['max_inventory'].to_numpy()
+    plans = {scale: baseline * scale for scale in (0.5, 0.8, 1.0, 1.2, 1.5)}
+
+    # A two-plan cache so later batches mix hits, misses and evictions
+    evaluator = PlanEvaluator(model, current_kpis, cache_size=2)
+    for batch in ([0.5, 1.5], [0.8, 1.2, 0.5, 1.0], [1.0, 1.5, 1.0]):
+        batched = evaluator.evaluate(np.array([plans[scale] for scale in batch]))
+        single = pd.concat([PlanEvaluator(model, current_kpis).evaluate(plans[scale]) for scale in batch],
+                           ignore_index=True)
+        pd.testing.assert_frame_equal(batched, single)
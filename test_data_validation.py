@@ -0,0 +1,60 @@
+# test_data_validation.py
+# Data Validation Tests
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+from data_validation import validate_datasets
+
+def _sample_sheets():
+    """Minimal valid workbook: two SKUs in two stores"""
+    skus = ['P1001', 'P1002']
+    stores = ['S1', 'S2']
+    pairs = pd.MultiIndex.from_product([stores, skus], names=['store_id', 'sku_id']).to_frame(index=False)
+    sales = pd.MultiIndex.from_product([pd.date_range('2024-01-01', periods=5), stores, skus],
+                                       names=['date', 'store_id', 'sku_id']).to_frame(index=False)
+    sales['quantity_sold'] = 3
+    return {
+        'SKU_master': pd.DataFrame({'sku_id': skus, 'category': 'Dairy', 'unit_cost': [10.0, 20.0],
+                                    'avg_lead_time': [5, 7], 'shelf_life_days': [7, 30]}),
+        'Inventory_data': pairs.assign(current_stock=50),
+        'Sales_data': sales,
+        'Purchase_orders': pd.DataFrame({'po_id': ['PO1', 'PO2'], 'sku_id': skus,
+                                         'order_date': pd.to_datetime(['2024-01-01', '2024-01-02']),
+                                         'expected_delivery_date': pd.to_datetime(['2024-01-06', '2024-01-09']),
+                                         'quantity_ordered': [100, 200]}),
+        'Supplier_data': pd.DataFrame({'sku_id': skus, 'supplier_id': ['SUP1', 'SUP2'],
+                                       'service_level': [0.95, 0.9], 'delay_rate': [0.05, 0.1]})
+    }
+
+def _reasons(quarantine, sheet):
+    return quarantine.loc[quarantine['sheet'] == sheet, 'reason_code'].value_counts().to_dict()
+
+def test_rows_of_a_quarantined_sku_are_flagged_as_parent_quarantined():
+    sheets = _sample_sheets()
+    sheets['SKU_master'].loc[0, 'shelf_life_days'] = np.nan
+
+    clean, quarantine = validate_datasets(sheets)
+
+    assert _reasons(quarantine, 'SKU_master') == {'MISSING_VALUE': 1}
+    assert _reasons(quarantine, 'Sales_data') == {'PARENT_QUARANTINED': 10}
+    assert _reasons(quarantine, 'Inventory_data') == {'PARENT_QUARANTINED': 2}
+    assert (clean['Sales_data']['sku_id'] == 'P1002').all()
+
+def test_unknown_sku_is_still_reported_as_unknown():
+    sheets = _sample_sheets()
+    sheets['Purchase_orders'].loc[1, 'sku_id'] = 'P9999'
+
+    _, quarantine = validate_datasets(sheets)
+
+    assert _reasons(quarantine, 'Purchase_orders') == {'UNKNOWN_SKU': 1}
+
+def test_string_columns_reject_non_text_values():
+    sheets = _sample_sheets()
+    sheets['Supplier_data']['supplier_id'] = sheets['Supplier_data']['supplier_id'].astype(object)
+    sheets['Supplier_data'].loc[0, 'supplier_id'] = 101
+
+    clean, quarantine = validate_datasets(sheets)
+
+    assert _reasons(quarantine, 'Supplier_data') == {'INVALID_TYPE': 1}
+    assert clean['Supplier_data']['supplier_id'].tolist() == ['SUP2']
@@ -0,0 +1,47 @@
+# test_rebalancing.py
+# Inter-Store Rebalancing Tests
+# Inventory Rewired Project
+
+import pandas as pd
+import numpy as np
+from rebalancing import optimize_stock_rebalancing
+
+def _tables(stores, reorder_point, max_inventory, current_stock):
+    """One-SKU inventory model and inventory data"""
+    inventory_model = pd.DataFrame({'store_id': stores, 'sku_id': 'P1001',
+                                    'reorder_point': reorder_point, 'max_inventory': max_inventory})
+    inventory_data = pd.DataFrame({'store_id': stores, 'sku_id': 'P1001', 'current_stock': current_stock})
+    return inventory_model, inventory_data
+
+def _two_path_case():
+    """Max flow needs the two expensive routes, not the single free one"""
+    stores = ['D1', 'D2', 'R1', 'R2']
+    inventory_model, inventory_data = _tables(stores, [0.0, 0.0, 5.0, 5.0], [0.0, 0.0, 10.0, 10.0],
+                                              [1.0, 1.0, 4.0, 4.0])
+    transfer_costs = pd.DataFrame(np.nan, index=stores, columns=stores)
+    transfer_costs.loc['D1', 'R1'] = 0.0
+    transfer_costs.loc['D1', 'R2'] = 10.0
+    transfer_costs.loc['D2', 'R1'] = 10.0
+    return inventory_model, inventory_data, transfer_costs
+
+def test_min_cost_flow_moves_as_many_units_as_possible():
+    transfer_plan, summary = optimize_stock_rebalancing(*_two_path_case(), method='min_cost_flow')
+
+    assert summary['units_transferred'] == 2
+    assert summary['unresolved_deficit_units'] == 0
+    assert summary['total_transfer_cost'] == 20
+    assert set(zip(transfer_plan['from_store'], transfer_plan['to_store'])) == {('D1', 'R2'), ('D2', 'R1')}
+
+def test_greedy_skips_transfers_without_a_route():
+    transfer_plan, summary = optimize_stock_rebalancing(*_two_path_case(), method='greedy')
+
+    assert transfer_plan['unit_transfer_cost'].notna().all()
+    assert summary['total_transfer_cost'] == transfer_plan['transfer_cost'].sum()
+    assert summary['units_transferred'] + summary['unresolved_deficit_units'] == 2
+
+def test_store_is_never_both_donor_and_receiver():
+    inventory_model, inventory_data = _tables(['S1', 'S2'], [50.0, 10.0], [30.0, 30.0], [35.0, 0.0])
+
+    transfer_plan, _ = optimize_stock_rebalancing(inventory_model, inventory_data, method='greedy')
+
+    assert (transfer_plan['from_store'] != transfer_plan['to_store']).all()